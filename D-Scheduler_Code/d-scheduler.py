@@ -1,20 +1,26 @@
-import json,re,sys,uuid,webbrowser,math
+import json,os,re,sys,uuid,webbrowser,math,mmap,bisect,hashlib
 from pathlib import Path
 from datetime import date, timedelta
-from typing import Dict, List, Set
+from typing import Dict, List, Set, Tuple
 
-from PyQt6.QtCore import Qt, QDate, QDateTime, pyqtSignal, QTimer
+from PyQt6.QtCore import (
+    Qt, QDate, QDateTime, QEvent, pyqtSignal, QTimer,
+    QAbstractTableModel, QModelIndex, QPersistentModelIndex, QSize, QRectF,
+    QRegularExpression, QObject, QRunnable, QThreadPool
+)
 from PyQt6.QtGui import (
     QAction, QFont, QSyntaxHighlighter,QGuiApplication, QCursor,
-    QTextCharFormat, QColor, QTextCursor, QCloseEvent
+    QTextCharFormat, QColor, QTextCursor, QCloseEvent,
+    QTextDocument, QAbstractTextDocumentLayout, QPalette
 )
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout,
-    QTableWidget, QTableWidgetItem, QTextEdit, QPushButton, QLabel,
-    QSpinBox, QLineEdit, QFileDialog, QListWidget, QListWidgetItem,
+    QTableView, QTextEdit, QPushButton, QLabel,
+    QSpinBox, QLineEdit, QFileDialog, QListWidget,
     QMessageBox, QAbstractItemView, QTextBrowser, QDialog, QFormLayout,
     QGroupBox, QTreeWidget, QTreeWidgetItem, QCalendarWidget,
-    QHBoxLayout, QRadioButton, QCheckBox,QTabWidget
+    QHBoxLayout, QRadioButton, QCheckBox,QTabWidget,
+    QStyledItemDelegate, QStyleOptionViewItem, QStyle
 )
 
 try:
@@ -23,14 +29,36 @@ try:
 except Exception:
     HAS_JPHOLIDAY = False
 
+try:
+    import orjson  # pip install orjson（任意：JSON 読み書きの高速化）
+    HAS_ORJSON = True
+except Exception:
+    HAS_ORJSON = False
+
+try:
+    import xxhash  # pip install xxhash（任意：自動保存の内容比較の高速化）
+    HAS_XXHASH = True
+except Exception:
+    HAS_XXHASH = False
+
 # --------- 定数/ユーティリティ ----------
-JP_WEEK = ["月", "火", "水", "木", "金", "土", "日"]
+JP_WEEK = ("月", "火", "水", "木", "金", "土", "日")
 URL_RE = re.compile(r"https?://\S+", re.IGNORECASE)
+URL_TRAIL_CHARS = ")]}.,;:!?、。"  # URL 末尾に付いても URL の一部とみなさない文字
+# 末尾の除去までを含めた URL パターン（ハイライト用：一致範囲＝ハイライト範囲）
+URL_HIGHLIGHT_PATTERN = r"https?://(?=\S)(?:\S*[^\s)\]}.,;:!?、。])?"
+DATE_RE = re.compile(r"\d{4}-\d{2}-\d{2}")  # "YYYY-MM-DD"（fullmatch で使う）
 COLUMN_WIDTH_MIN = 30
 COLUMN_WIDTH_MAX = 1200
+MAX_RANGE_DAYS = 365  # テーブルに保持する最大日数（超えた分は反対側の端から捨てる）
+STREAM_SAVE_MIN_DAYS = 3000  # これ以上の日数を持つ保存は（orjson が無ければ）少しずつ書き出す
+PREFETCH_DAYS = 30  # 日付へ移動した後、手が空いた時に基準日より前へ先に足しておく日数
+SETTINGS_SAVE_DELAY_MS = 2000  # 設定変更をまとめて書き込むまでの待ち時間（終了時は即時）
 SETTINGS_PATH = Path.home() / ".calendar_notes_settings.json"
 DEFAULT_AUTOSAVE_DIR = Path.home() / "D-Schedule"
 DEFAULT_AUTOSAVE = DEFAULT_AUTOSAVE_DIR / "calendar-notes_autosave.json"
+AUTOSAVE_DELTA_SUFFIX = ".delta.jsonl"  # 自動保存の差分ログ（本体 JSON の隣に置く）
+AUTOSAVE_DELTA_MAX_BYTES = 1 << 20      # 差分ログがこれを超えたら本体へ書き戻して空にする
 
 
 def _strip_url_trailing_punct(u: str) -> str:
@@ -38,46 +66,266 @@ def _strip_url_trailing_punct(u: str) -> str:
     URL抽出後の末尾に付くことがある句読点や括弧類を除去する。
     例: "https://example.com)." → "https://example.com"
     """
-    if not u:
-        return u
-    # 末尾の )]}.,;:!?、。 を連続で取り除く
-    while u and u[-1] in ")]}.,;:!?、。":
-        u = u[:-1]
-    return u
-
-def pad2(n: int) -> str:
-    return str(n).zfill(2)
+    # 末尾の )]}.,;:!?、。 を連続で取り除く（1文字ずつ切り詰めず C 実装の rstrip で一度に）
+    return u.rstrip(URL_TRAIL_CHARS) if u else u
 
 def parse_holidays_str(s: str) -> Set[str]:
     vals = set()
     if not s:
         return vals
-    for token in re.split(r"[,\s]+", s.strip()):
-        t = token.strip()
-        if re.fullmatch(r"\d{4}-\d{2}-\d{2}", t):
+    # 固定長の "YYYY-MM-DD" だけを拾う（正規表現を使わず文字列操作で判定）
+    for t in s.replace(",", " ").split():
+        if (len(t) == 10 and t[4] == "-" and t[7] == "-"
+                and t[:4].isdigit() and t[5:7].isdigit() and t[8:].isdigit()):
             vals.add(t)
     return vals
 
 def date_key(dt: date) -> str:
-    return dt.strftime("%Y-%m-%d")
+    # strftime は書式の解析を経由して遅いため、同じ "YYYY-MM-DD" を返す C 実装の isoformat を使う
+    return dt.isoformat()
+
+# 整形なしの出力は C 実装のエンコーダが使われるよう、1つを使い回す
+_COMPACT_ENCODER = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+def json_dumps_bytes(obj, indent: bool = True) -> bytes:
+    """UTF-8 の JSON（indent=True で2字下げ整形）。orjson があればそちらで高速に生成する。"""
+    if HAS_ORJSON:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    if indent:
+        return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+    return _COMPACT_ENCODER.encode(obj).encode("utf-8")
+
+def json_load_path(path: Path):
+    """
+    UTF-8 の JSON ファイルを読み込む。orjson があればファイルを mmap して
+    bytes へコピーせずにそのまま解析する（大きな自動保存でもメモリが倍にならない）。
+    """
+    if HAS_ORJSON:
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return orjson.loads(b"")  # 空ファイルは通常どおり解析エラーにする
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                with memoryview(mm) as buf:
+                    return orjson.loads(buf)
+    return json.loads(Path(path).read_bytes().decode("utf-8"))
+
+def content_digest(data: bytes) -> bytes:
+    """書き込む内容の短いハッシュ（前回と同じ内容なら書き込みを省くため）"""
+    if HAS_XXHASH:
+        return xxhash.xxh3_64_digest(data)
+    return hashlib.blake2b(data, digest_size=8).digest()
+
+def delta_path_for(path: Path) -> Path:
+    return path.with_name(path.name + AUTOSAVE_DELTA_SUFFIX)
+
+def is_private_autosave(path: Path) -> bool:
+    """アプリ専用の自動保存ファイル(DEFAULT_AUTOSAVE)か。差分ログはこのファイルにだけ使う。"""
+    try:
+        return Path(path).expanduser().resolve() == DEFAULT_AUTOSAVE.resolve()
+    except OSError:
+        return False
+
+def new_delta_gen() -> str:
+    """本体 JSON と差分ログを結び付ける世代 id（本体を全体で書き直すたびに新しくする）"""
+    return uuid.uuid4().hex
+
+def atomic_write_bytes(path: Path, data: bytes):
+    """
+    一時ファイルへ書いてから置き換える（書き込み途中で落ちても本体は壊れない）。
+    置き換えの前に fsync して、電源断などで中身の無いファイルに差し替わらないようにする。
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+def atomic_write_json_stream(path: Path, obj, indent: bool = True):
+    """
+    大きな文書向け：iterencode の断片をそのまま一時ファイルへ書き出してから置き換える。
+    文書全体の文字列／bytes を作らないので、メモリの山が断片の大きさで済む。
+    """
+    enc = json.JSONEncoder(ensure_ascii=False, indent=2) if indent else _COMPACT_ENCODER
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    with tmp.open("w", encoding="utf-8") as f:
+        write = f.write
+        for chunk in enc.iterencode(obj):
+            write(chunk)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+def clean_cells_row(v) -> Dict[str, str] | None:
+    """cells の1日分 {col_id: str} を検証して返す。不正なら None。"""
+    if not isinstance(v, dict):
+        return None
+    entry = {}
+    for cid, txt in v.items():
+        if not isinstance(cid, str):
+            continue
+        # 通常は既に str なので str() による作り直しを省く
+        entry[sys.intern(cid)] = txt if type(txt) is str else ("" if txt is None else str(txt))
+    return entry
+
+def cells_to_soa(cells: Dict[str, Dict[str, str]]) -> dict:
+    """
+    cells を列ごとの配列に並べ替える（自動保存用）：
+    {"keys": [日付キー...], "cols": {col_id: [str | None, ...]}}
+    None はその日にその列の値が無いことを表す。
+    """
+    keys = sorted(cells)
+    cids = []
+    seen = set()
+    for k in keys:
+        for cid in cells[k]:
+            if cid not in seen:
+                seen.add(cid)
+                cids.append(cid)
+    return {"keys": keys, "cols": {cid: [cells[k].get(cid) for k in keys] for cid in cids}}
+
+def build_snapshot(columns: List[dict], cells: Dict[str, Dict[str, str]], compact: bool,
+                   delta_gen: str | None = None) -> dict:
+    """
+    保存する内容。compact=True なら cells を列ごとの配列にまとめる（小さく速い）。
+    delta_gen があれば記録する（差分ログはこの世代の行だけが再生される）。
+    """
+    if compact:
+        snap = {"columns": columns, "cells_soa": cells_to_soa(cells)}
+    else:
+        snap = {"columns": columns, "cells": cells}
+    if delta_gen:
+        snap["delta_gen"] = delta_gen
+    return snap
+
+def soa_to_cells(soa) -> Dict[str, Dict[str, str]]:
+    """cells_to_soa の逆変換。不正な部分は読み飛ばす。"""
+    cells: Dict[str, Dict[str, str]] = {}
+    if not isinstance(soa, dict):
+        return cells
+    keys = soa.get("keys")
+    cols = soa.get("cols")
+    if not (isinstance(keys, list) and isinstance(cols, dict)):
+        return cells
+    rows = []
+    for k in keys:
+        if isinstance(k, str) and DATE_RE.fullmatch(k):
+            entry = {}
+            cells[sys.intern(k)] = entry
+            rows.append(entry)
+        else:
+            rows.append(None)
+    for cid, vals in cols.items():
+        if not (isinstance(cid, str) and isinstance(vals, list)):
+            continue
+        cid = sys.intern(cid)
+        for entry, txt in zip(rows, vals):
+            if entry is not None and txt is not None:
+                entry[cid] = txt if type(txt) is str else str(txt)
+    return cells
+
+def build_search_corpus(cells: Dict[str, Dict[str, str]], lower: Dict[str, Dict[str, str]], col_ids: List[str]):
+    """
+    検索用に全セルの小文字化テキスト（lower：cells と同じ形の小文字版）を
+    日付順に "\x00" 区切りで1本の文字列へつなぐ。
+    戻り値 (blob, starts, entries)：entries[i] = (日付キー, 列番号, 元テキスト) が
+    blob[starts[i]:] から始まる。str.find で C の速度のまま走査できる。
+    """
+    parts = []
+    starts = []
+    entries = []
+    pos = 0
+    for key in sorted(cells):
+        row = cells[key]
+        low_row = lower.get(key, {})
+        for ci, cid in enumerate(col_ids):
+            txt = row.get(cid, "") or ""
+            if not txt:
+                continue
+            low = low_row.get(cid)
+            if low is None:
+                low = txt.lower()
+            parts.append(low)
+            starts.append(pos)
+            entries.append((key, ci, txt))
+            pos += len(low) + 1
+    return "\x00".join(parts), starts, entries
+
+def date_keys_from(first: date, n: int) -> List[str]:
+    """
+    first から連続 n 日分の日付キー。timedelta を介さず序数で日付を作る。
+    キーは intern して self.cells のキーと同じ文字列オブジェクトを共有させる。
+    """
+    base = first.toordinal()
+    return [sys.intern(date_key(date.fromordinal(base + i))) for i in range(n)]
+
+# 日付列の色区分
+DAY_PLAIN, DAY_SAT, DAY_RED = 0, 1, 2
+# 曜日(月=0..日=6) → (表記, 祝日でない場合の色区分)
+WEEKDAY_STYLE = tuple((JP_WEEK[w], DAY_RED if w == 6 else DAY_SAT if w == 5 else DAY_PLAIN) for w in range(7))
+
+def row_meta_from(first: date, n: int, is_holiday) -> List[Tuple[str, int]]:
+    """
+    first から連続 n 日分の (日付ラベル, 色区分) をまとめて作る。
+    曜日は序数から整数演算で求める（序数1 = 西暦1年1月1日 = 月曜）。
+    """
+    base = first.toordinal()
+    out = []
+    for o in range(base, base + n):
+        dt = date.fromordinal(o)
+        jp, kind = WEEKDAY_STYLE[(o + 6) % 7]  # 月=0..日=6
+        if kind != DAY_RED and is_holiday(dt):
+            kind = DAY_RED
+        out.append((f"{dt.month}月{dt.day:02d}日({jp})", kind))
+    return out
+
+def doc_full_height(doc: QTextDocument, text_width: int, frame_px: int, padding_px: int) -> int:
+    """
+    折り返し幅 text_width でレイアウトした文書の、セルとして必要な高さ(px)を返す。
+    エディタ(AutoResizeTextEdit)と表示用デリゲートで同じ計算式を共有する。
+    """
+    w = max(1, text_width)
+    # setTextWidth は同じ幅でも全体を再レイアウトするため、幅が変わった時だけ設定する
+    if doc.textWidth() != w:
+        doc.setTextWidth(w)
+    size = doc.documentLayout().documentSize()
+    h_doc = int(math.ceil(size.height()))
+    margin = int(doc.documentMargin())
+    return max(36, h_doc + 2 * frame_px + 2 * margin + padding_px) + 1
 
 
 # ---------- URLハイライター ----------
 class UrlHighlighter(QSyntaxHighlighter):
+    # 書式と正規表現は全インスタンスで共有（エディタを開くたびに作り直し・コンパイルしない）
+    _shared = None
+
     def __init__(self, parent=None):
         super().__init__(parent)
-        fmt = QTextCharFormat()
-        fmt.setForeground(QColor("blue"))
-        fmt.setFontUnderline(True)
-        self.format = fmt
+        if UrlHighlighter._shared is None:
+            fmt = QTextCharFormat()
+            fmt.setForeground(QColor("blue"))
+            fmt.setFontUnderline(True)
+            # Qt 側(PCRE2/JIT)の1回の照合で末尾句読点の除去まで済ませ、Python 側の後処理を無くす
+            rx = QRegularExpression(
+                URL_HIGHLIGHT_PATTERN,
+                QRegularExpression.PatternOption.CaseInsensitiveOption
+                | QRegularExpression.PatternOption.UseUnicodePropertiesOption  # \S を Python と同じく Unicode 準拠に
+            )
+            rx.optimize()
+            UrlHighlighter._shared = (fmt, rx)
+        self.format, self._re = UrlHighlighter._shared
 
     def highlightBlock(self, text: str):
-        # URL検出後、末尾の句読点・括弧などを取り除き、実際にハイライトする長さを調整する。
-        for m in URL_RE.finditer(text):
-            start, end = m.span()
-            frag = text[start:end]
-            cleaned = _strip_url_trailing_punct(frag)
-            self.setFormat(start, len(cleaned), self.format)
+        # URL を含まないブロック（大半のメモ）は正規表現を走らせずに抜ける
+        if "://" not in text:
+            return
+        # 一致範囲は末尾の句読点・括弧を含まないので、そのままハイライトする
+        it = self._re.globalMatch(text)
+        while it.hasNext():
+            m = it.next()
+            self.setFormat(m.capturedStart(0), m.capturedLength(0), self.format)
 
 
 # ---------- 自動リサイズ付きテキストエディタ ----------
@@ -90,13 +338,23 @@ class AutoResizeTextEdit(QTextEdit):
         self.setAcceptRichText(False)
         self.setFont(QFont("Meiryo UI", base_font_pt))
         self._padding_px = 6
+        # measureFullHeight の結果キャッシュ（文書リビジョン・幅・枠・文字サイズが同じなら再計算しない）
+        self._height_key = None
+        self._height_cache = 0
+        self._resize_pending = False
 
         self.setContentsMargins(0, 0, 0, 0)
         self.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
         self.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
         self.document().setDocumentMargin(2)
-
-        self.highlighter = UrlHighlighter(self.document())
+        # measureFullHeight で毎回 Qt へ問い合わせないよう、文書・枠幅・文字サイズを保持
+        # （枠幅と文字サイズは変更時に changeEvent で取り直す）
+        self._doc = self.document()
+        self._fw = self.frameWidth()
+        self._pt = self.font().pointSize()
+
+        # URL ハイライトはフォーカス中だけ文書に付ける（非フォーカス時の再ハイライトを避ける）
+        self.highlighter = UrlHighlighter()
         self.textChanged.connect(self._auto_resize)
         self._auto_resize()
 
@@ -111,6 +369,24 @@ class AutoResizeTextEdit(QTextEdit):
         self.addAction(act_openurl)
         self.addAction(act_urllist)
 
+    def focusInEvent(self, ev):
+        if self.highlighter.document() is None:
+            self.highlighter.setDocument(self.document())
+        super().focusInEvent(ev)
+
+    def focusOutEvent(self, ev):
+        # 右クリックメニュー表示などの一時的なフォーカス移動では外さない
+        if ev.reason() != Qt.FocusReason.PopupFocusReason:
+            self.highlighter.setDocument(None)
+        super().focusOutEvent(ev)
+
+    def changeEvent(self, ev):
+        super().changeEvent(ev)
+        # 枠幅の変化は内容領域の変化（ContentsRectChange）として通知される
+        if ev.type() in (QEvent.Type.ContentsRectChange, QEvent.Type.StyleChange, QEvent.Type.FontChange):
+            self._fw = self.frameWidth()
+            self._pt = self.font().pointSize()
+
     def mouseDoubleClickEvent(self, ev):
         cursor = self.cursorForPosition(ev.pos())
         cursor.select(QTextCursor.SelectionType.WordUnderCursor)
@@ -121,30 +397,36 @@ class AutoResizeTextEdit(QTextEdit):
             super().mouseDoubleClickEvent(ev)
 
     def setPointSize(self, pt: int):
+        # 同じ大きさなら setFont による文書の再レイアウトを起こさない
+        if pt == self._pt:
+            return
         f = self.font()
         f.setPointSize(pt)
         self.setFont(f)
         self._auto_resize()
 
     def measureFullHeight(self) -> int:
-        doc = self.document()
-        vw = max(1, self.viewport().width() - 1)
-        doc.setTextWidth(vw)
-        size = doc.documentLayout().documentSize()
-
-        h_doc = int(math.ceil(size.height()))
-        fw = self.frameWidth()
-        margin = int(doc.documentMargin())
-        pad = self._padding_px
-        return max(36, h_doc + 2 * fw + 2 * margin + pad) + 1
+        vw = self.viewport().width() - 1
+        doc = self._doc
+        key = (doc.revision(), vw, self._fw, self._pt)
+        if key != self._height_key:
+            self._height_cache = doc_full_height(doc, vw, self._fw, self._padding_px)
+            self._height_key = key
+        return self._height_cache
 
     def _auto_resize(self):
-        # 1パス目
         h1 = self.measureFullHeight()
-        if self.height() != h1:
-            self.setFixedHeight(h1)
-            self.heightChanged.emit(h1)
-        # 2パス目（同期：再レイアウト直後にもう一度）
+        if self.height() == h1:
+            return
+        self.setFixedHeight(h1)
+        self.heightChanged.emit(h1)
+        # 高さが変わったときだけ、再レイアウト後にもう一度測る（連続入力中は1回にまとまる）
+        if not self._resize_pending:
+            self._resize_pending = True
+            QTimer.singleShot(0, self._auto_resize_second_pass)
+
+    def _auto_resize_second_pass(self):
+        self._resize_pending = False
         h2 = self.measureFullHeight()
         if self.height() != h2:
             self.setFixedHeight(h2)
@@ -159,8 +441,7 @@ class AutoResizeTextEdit(QTextEdit):
         self._preview_holder = dlg
 
     def _extract_urls(self) -> list[str]:
-        txt = self.toPlainText() or ""
-        raw = URL_RE.findall(txt)
+        raw = URL_RE.findall(self.toPlainText())
         return [_strip_url_trailing_punct(u) for u in raw]
 
     def open_first_url(self):
@@ -183,8 +464,7 @@ class UrlListDialog(QDialog):
         self.setMinimumSize(560, 360)
         v = QVBoxLayout(self)
         self.list = QListWidget()
-        for u in urls:
-            self.list.addItem(QListWidgetItem(u))
+        self.list.addItems(urls)  # 1件ずつ追加せず、まとめて1回で入れる
         v.addWidget(self.list, 1)
 
         h = QHBoxLayout()
@@ -547,7 +827,7 @@ class SettingsDialog(QDialog):
         # 列タブ: 現在の順序で columns を構築
         cols = []
         for e in self._col_rows:
-            cid = e["id"] or (e["le_title"].text().strip() or "col") + "-" + uuid.uuid4().hex[:4]
+            cid = sys.intern(e["id"] or (e["le_title"].text().strip() or "col") + "-" + uuid.uuid4().hex[:4])
             title = e["le_title"].text().strip() or cid
             width = max(COLUMN_WIDTH_MIN, min(int(e["sp_width"].value()), COLUMN_WIDTH_MAX))
             cols.append({"id": cid, "title": title, "width": width})
@@ -557,11 +837,10 @@ class SettingsDialog(QDialog):
         if hasattr(self, "ed_holidays") and self.ed_holidays is not None:
             holidays_text = self.ed_holidays.toPlainText() or ""
 
-        rx = re.compile(r"^\d{4}-\d{2}-\d{2}$")
         mh_list = sorted({
-            line.strip()
-            for line in holidays_text.splitlines()
-            if rx.match(line.strip())
+            t
+            for t in (line.strip() for line in holidays_text.splitlines())
+            if DATE_RE.fullmatch(t)
         })
 
         # 設定辞書に反映
@@ -612,39 +891,54 @@ class SearchDialog(QDialog):
         btn_find.clicked.connect(self._do_search)
         self.tree.itemActivated.connect(self._jump_and_close)
 
+    def reset(self):
+        """再表示の前に前回の結果を消す（検索語は残して全選択）"""
+        self.tree.clear()
+        self.ed_query.selectAll()
+        self.ed_query.setFocus()
+
     def _do_search(self):
         q = (self.ed_query.text() or "").strip().lower()
         self.tree.clear()
         if not q:
             return
 
-        def add_result(dt: date, col_title: str, txt: str):
-            label = f"{dt.month}月{pad2(dt.day)}日({JP_WEEK[dt.weekday()]})"
-            item = QTreeWidgetItem([label, col_title, txt.replace("\n", " ")])
-            item.setData(0, Qt.ItemDataRole.UserRole, (dt.year, dt.month, dt.day))
-            self.tree.addTopLevelItem(item)
-
-        if self.rb_all.isChecked():
-            for key, row in self.app.cells.items():
+        blob, starts, entries = self.app.search_corpus()
+        lo, hi = 0, len(blob)
+        if not self.rb_all.isChecked():
+            # テーブルに展開済みの範囲のみ（ISO 形式のキーは文字列比較で日付順になる）
+            start_key = date_key(self.app.range_start)
+            end_key = date_key(self.app.range_end)
+            i = bisect.bisect_left(entries, (start_key,))
+            j = bisect.bisect_left(entries, (end_key + "\x00",))
+            lo = starts[i] if i < len(starts) else hi
+            hi = starts[j] if j < len(starts) else hi
+
+        cols = self.app.columns
+        items = []
+        # ヒットは日付順に並ぶので、日付ラベルは日付が変わったときだけ作る
+        last_key, label, meta = None, None, None
+        pos = blob.find(q, lo, hi)
+        while pos != -1:
+            i = bisect.bisect_right(starts, pos) - 1
+            key, ci, txt = entries[i]
+            if key != last_key:
+                last_key = key
                 try:
-                    y, m, d = map(int, key.split("-"))
-                    dt = date(y, m, d)
-                except:
-                    continue
-                for col in self.app.columns:
-                    txt = (row.get(col["id"], "") or "")
-                    if q in txt.lower():
-                        add_result(dt, col["title"], txt)
-        else:
-            # テーブルに展開済みの範囲のみ
-            cur = self.app.range_start
-            while cur <= self.app.range_end:
-                row = self.app.cells.get(date_key(cur), {})
-                for col in self.app.columns:
-                    txt = (row.get(col["id"], "") or "")
-                    if q in txt.lower():
-                        add_result(cur, col["title"], txt)
-                cur += timedelta(days=1)
+                    dt = date.fromisoformat(key)
+                    label = f"{dt.month}月{dt.day:02d}日({JP_WEEK[dt.weekday()]})"
+                    meta = (dt.year, dt.month, dt.day)
+                except ValueError:
+                    label = None
+            if label is not None:
+                item = QTreeWidgetItem([label, cols[ci]["title"], txt.replace("\n", " ")])
+                item.setData(0, Qt.ItemDataRole.UserRole, meta)
+                items.append(item)
+            # 同じセル内の2件目以降は数えず、次のセルから探す
+            if i + 1 >= len(starts):
+                break
+            pos = blob.find(q, starts[i + 1], hi)
+        self.tree.addTopLevelItems(items)
 
     def _jump_and_close(self, item: QTreeWidgetItem):
         meta = item.data(0, Qt.ItemDataRole.UserRole)
@@ -668,10 +962,7 @@ class MonthPickerDialog(QDialog):
 
         v = QVBoxLayout(self)
         self.cal = QCalendarWidget()
-
-        # 直近のアンカー日を初期選択（前回選んだ日を再表示）
-        anchor = getattr(self.app, "current_anchor_date", None) or self.app.range_start
-        self.cal.setSelectedDate(QDate(anchor.year, anchor.month, anchor.day))
+        self.reset()
         v.addWidget(self.cal)
 
         # ボタン群：今日へ / この日に合わせる（最上行） / 閉じる
@@ -688,6 +979,11 @@ class MonthPickerDialog(QDialog):
         btn_ok.clicked.connect(self._apply_and_close)
         btn_close.clicked.connect(self.reject)
 
+    def reset(self):
+        """直近のアンカー日を初期選択（前回選んだ日を再表示）"""
+        anchor = getattr(self.app, "current_anchor_date", None) or self.app.range_start
+        self.cal.setSelectedDate(QDate(anchor.year, anchor.month, anchor.day))
+
     def _jump_today(self):
         """今日を基準にして、今日が最上行に来るよう表示を切り替える"""
         t = date.today()
@@ -708,6 +1004,383 @@ class MonthPickerDialog(QDialog):
         self.accept()
 
 
+# ---------- 自動保存の書き込み（UIスレッド外） ----------
+class AutosaveSignals(QObject):
+    failed = pyqtSignal(str)
+    written = pyqtSignal(object, int)  # 全体保存の (保存先, 内容のハッシュ), 受付時の世代
+
+
+class AutosaveTask(QRunnable):
+    """
+    シリアライズ済みの bytes をファイルへ書き込むだけのタスク。
+    append=False: 本体 JSON をアトミックに置換し、差分ログを削除
+    append=True : 差分ログへ追記
+    """
+    def __init__(self, path: Path, data: bytes, append: bool, signals: AutosaveSignals):
+        super().__init__()
+        self.path = path
+        self.data = data
+        self.append = append
+        self.signals = signals
+
+    def run(self):
+        try:
+            if self.append:
+                with delta_path_for(self.path).open("ab") as f:
+                    f.write(self.data)
+            else:
+                atomic_write_bytes(self.path, self.data)
+                delta_path_for(self.path).unlink(missing_ok=True)
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+
+
+class SnapshotAutosaveTask(QRunnable):
+    """
+    全体の自動保存。UIスレッドでは columns / cells の浅いコピーを渡すだけにして、
+    シリアライズ・内容比較・書き込みをワーカーで行う。
+    （cells の1日分の dict は編集のたびに新しい dict へ置き換えるため、浅いコピーで安全）
+    直前に書いた内容(skip_digest)と同じで差分ログも無ければ書き込まない。
+    compact=True（アプリ専用の自動保存ファイル）なら cells_soa 形式、
+    それ以外（ユーザーが選んだファイル）は「保存」と同じ整形済みの cells 形式で書く。
+    """
+    def __init__(self, path: Path, columns: List[dict], cells: Dict[str, Dict[str, str]],
+                 compact: bool, delta_gen: str | None, skip_digest, epoch: int,
+                 signals: AutosaveSignals):
+        super().__init__()
+        self.path = path
+        self.columns = columns
+        self.cells = cells
+        self.compact = compact
+        self.delta_gen = delta_gen
+        self.skip_digest = skip_digest
+        self.epoch = epoch
+        self.signals = signals
+
+    def run(self):
+        try:
+            snap = build_snapshot(self.columns, self.cells, compact=self.compact, delta_gen=self.delta_gen)
+            data = json_dumps_bytes(snap, indent=not self.compact)
+            digest = (self.path, content_digest(data))
+            if digest != self.skip_digest or delta_path_for(self.path).exists():
+                atomic_write_bytes(self.path, data)
+                # ここで落ちて差分ログが残っても、世代が違うので読み込み時には再生されない
+                delta_path_for(self.path).unlink(missing_ok=True)
+            self.signals.written.emit(digest, self.epoch)
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+
+
+# ---------- 表モデル（self.cells を直接参照） ----------
+class CalendarModel(QAbstractTableModel):
+    """
+    行 = range_start からの日数、0列目 = 日付、1列目以降 = app.columns。
+    セルの文字列は app.cells を直接読み書きし、ウィジェットは一切持たない。
+    """
+    # 日付列の色（日祝ピンク・土曜水色）。data() のたびに色文字列を解析しないよう共有する
+    PINK_BG, PINK_FG = QColor("#FCE4EC"), QColor("#AD1457")
+    BLUE_BG, BLUE_FG = QColor("#E3F2FD"), QColor("#0D47A1")
+
+    def __init__(self, app: "CalendarApp"):
+        super().__init__(app)
+        self.app = app
+        # 行番号 → "YYYY-MM-DD" と (日付ラベル, 色区分)（範囲変更時にまとめて作る）
+        self._row_keys: List[str] = []
+        self._row_meta: List[Tuple[str, int]] = []
+        # 列番号-1 → 列 id（data() のたびに列 dict を引かないよう、列構成の変更時に作る）
+        self._col_ids: Tuple[str, ...] = ()
+        self._rebuild_row_keys()
+        self._rebuild_col_ids()
+
+    def _rebuild_row_keys(self):
+        n = (self.app.range_end - self.app.range_start).days + 1
+        self._row_keys = date_keys_from(self.app.range_start, n)
+        self._row_meta = row_meta_from(self.app.range_start, n, self.app._is_holiday_jp)
+
+    def _rebuild_col_ids(self):
+        self._col_ids = tuple(c["id"] for c in self.app.columns)
+
+    def refresh_row_meta(self):
+        """祝日設定の変更後に日付列の色区分を作り直して再描画させる。"""
+        n = self.rowCount()
+        self._row_meta = row_meta_from(self.app.range_start, n, self.app._is_holiday_jp)
+        if n > 0:
+            self.dataChanged.emit(self.index(0, 0), self.index(n - 1, 0))
+
+    def refresh_cells(self):
+        """範囲・列構成はそのままで app.cells が差し替わったとき、入力セルだけ再表示させる。"""
+        rows, cols = self.rowCount(), self.columnCount()
+        if rows > 0 and cols > 1:
+            self.dataChanged.emit(self.index(0, 1), self.index(rows - 1, cols - 1))
+
+    def refresh_headers(self):
+        """列名の変更後に見出しだけを再表示させる（列 id・セルは変わらない）。"""
+        n = len(self._col_ids)
+        if n > 0:
+            self.headerDataChanged.emit(Qt.Orientation.Horizontal, 1, n)
+
+    def key_at(self, row: int) -> str:
+        return self._row_keys[row]
+
+    def meta_at(self, row: int) -> Tuple[str, int]:
+        if 0 <= row < len(self._row_meta):
+            return self._row_meta[row]
+        return row_meta_from(self.date_at(row), 1, self.app._is_holiday_jp)[0]
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        # ビューから頻繁に呼ばれるため、範囲変更時に作った行キーの数をそのまま返す
+        if parent.isValid():
+            return 0
+        return len(self._row_keys)
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return 1 + len(self._col_ids)
+
+    def date_at(self, row: int) -> date:
+        return date.fromordinal(self.app._range_start_ord + row)
+
+    def data(self, index: QModelIndex, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+
+        # --- 日付セル ---
+        if index.column() == 0:
+            if role == Qt.ItemDataRole.DisplayRole:
+                return self.meta_at(index.row())[0]
+            if role in (Qt.ItemDataRole.BackgroundRole, Qt.ItemDataRole.ForegroundRole):
+                # 色付け（日祝ピンク・土曜水色）
+                kind = self.meta_at(index.row())[1]
+                if kind == DAY_RED:
+                    bg, fg = self.PINK_BG, self.PINK_FG
+                elif kind == DAY_SAT:
+                    bg, fg = self.BLUE_BG, self.BLUE_FG
+                else:
+                    return None
+                return bg if role == Qt.ItemDataRole.BackgroundRole else fg
+            return None
+
+        # --- 入力セル ---
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole):
+            col_id = self._col_ids[index.column() - 1]
+            return self.app.cells.get(self._row_keys[index.row()], {}).get(col_id, "")
+        return None
+
+    def headerData(self, section: int, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            if section == 0:
+                return "日付"
+            if 0 < section <= len(self.app.columns):
+                return self.app.columns[section - 1]["title"]
+        return super().headerData(section, orientation, role)
+
+    def flags(self, index: QModelIndex):
+        if not index.isValid() or index.column() == 0:
+            return Qt.ItemFlag.ItemIsEnabled
+        return Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable | Qt.ItemFlag.ItemIsEditable
+
+    def setData(self, index: QModelIndex, value, role=Qt.ItemDataRole.EditRole) -> bool:
+        if role != Qt.ItemDataRole.EditRole or not index.isValid() or index.column() == 0:
+            return False
+        key = self.key_at(index.row())
+        col_id = self._col_ids[index.column() - 1]
+        text = "" if value is None else str(value)
+        if self.app.cells.get(key, {}).get(col_id, "") == text:
+            return False
+        # 1日分の dict はその場で書き換えず新しい dict に置き換える（自動保存ワーカーが
+        # 浅いコピーした cells を読んでいる間も中身が変わらないように）
+        row = dict(self.app.cells.get(key, {}))
+        # 空にしたセル・日は保存対象に残さない（保存・読み込み・検索の量を増やさない）
+        if text:
+            row[col_id] = text
+        else:
+            row.pop(col_id, None)
+        if row:
+            self.app.cells[key] = row
+        else:
+            self.app.cells.pop(key, None)
+        self.app._note_lower(key, col_id, text)
+        self.app._mark_dirty(key)
+        self.dataChanged.emit(index, index, [Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole])
+        return True
+
+    # --- 範囲の変更（app.range_start / range_end を更新して通知） ---
+    def set_range(self, start: date, end: date):
+        self.beginResetModel()
+        self.app.range_start, self.app.range_end = start, end
+        self._rebuild_row_keys()
+        self._rebuild_col_ids()
+        self.endResetModel()
+
+    def append_days(self, n: int):
+        first = self.rowCount()
+        self.beginInsertRows(QModelIndex(), first, first + n - 1)
+        first_dt = self.app.range_end + timedelta(days=1)
+        self._row_keys.extend(date_keys_from(first_dt, n))
+        self._row_meta.extend(row_meta_from(first_dt, n, self.app._is_holiday_jp))
+        self.app.range_end += timedelta(days=n)
+        self.endInsertRows()
+
+    def prepend_days(self, n: int):
+        self.beginInsertRows(QModelIndex(), 0, n - 1)
+        self.app.range_start -= timedelta(days=n)
+        self._row_keys[:0] = date_keys_from(self.app.range_start, n)
+        self._row_meta[:0] = row_meta_from(self.app.range_start, n, self.app._is_holiday_jp)
+        self.endInsertRows()
+
+    def drop_front(self, n: int):
+        self.beginRemoveRows(QModelIndex(), 0, n - 1)
+        self.app.range_start += timedelta(days=n)
+        del self._row_keys[:n]
+        del self._row_meta[:n]
+        self.endRemoveRows()
+
+    def drop_back(self, n: int):
+        last = self.rowCount() - 1
+        self.beginRemoveRows(QModelIndex(), last - n + 1, last)
+        self.app.range_end -= timedelta(days=n)
+        del self._row_keys[len(self._row_keys) - n:]
+        del self._row_meta[len(self._row_meta) - n:]
+        self.endRemoveRows()
+
+
+# ---------- セル描画／編集デリゲート ----------
+class CellDelegate(QStyledItemDelegate):
+    """
+    入力セルは共有の QTextDocument 1つで描画（URLハイライト付き）し、
+    編集時だけ AutoResizeTextEdit を生成する（常駐エディタは最大1つ）。
+    """
+    PADDING_PX = 6
+    COMMIT_DELAY_MS = 200  # 連続入力はこの間隔でまとめてモデルへ反映
+
+    def __init__(self, app: "CalendarApp"):
+        super().__init__(app)
+        self.app = app
+        self._doc = QTextDocument(self)
+        self._doc.setDocumentMargin(2)
+        self._highlighter = UrlHighlighter(self._doc)
+        # エディタ(QTextEdit)と同じ枠幅で高さを計算する
+        self._frame_px = QTextEdit().frameWidth()
+        # 描画のたびに QFont を作らないよう、文字サイズが変わった時だけ作り直す
+        self._font_pt = None
+        self._font = QFont()
+
+    def _cell_font(self) -> QFont:
+        if self._font_pt != self.app.font_pt:
+            self._font_pt = self.app.font_pt
+            self._font = QFont("Meiryo UI", self._font_pt)
+            self._doc.setDefaultFont(self._font)
+        return self._font
+
+    def _layout_doc(self, text: str, cell_width: int) -> QTextDocument:
+        doc = self._doc
+        self._cell_font()
+        doc.setPlainText(text)
+        doc.setTextWidth(max(1, cell_width - 2 * self._frame_px - 1))
+        return doc
+
+    def sizeHint(self, option: QStyleOptionViewItem, index: QModelIndex) -> QSize:
+        if index.column() == 0:
+            return super().sizeHint(option, index)
+        width = self.app.table.columnWidth(index.column())
+        doc = self._layout_doc(index.data(Qt.ItemDataRole.EditRole) or "", width)
+        h = doc_full_height(doc, int(doc.textWidth()), self._frame_px, self.PADDING_PX)
+        return QSize(width, h)
+
+    def paint(self, painter, option: QStyleOptionViewItem, index: QModelIndex):
+        if index.column() == 0:
+            super().paint(painter, option, index)
+            return
+        opt = QStyleOptionViewItem(option)
+        self.initStyleOption(opt, index)
+        text = opt.text
+        opt.text = ""
+        # 背景（交互色など）だけ標準スタイルで描き、本文は文書として描く
+        style = opt.widget.style() if opt.widget else QApplication.style()
+        style.drawControl(QStyle.ControlElement.CE_ItemViewItem, opt, painter, opt.widget)
+        if not text:
+            return
+
+        rect = option.rect
+        doc = self._layout_doc(text, rect.width())
+        ctx = QAbstractTextDocumentLayout.PaintContext()
+        ctx.palette.setColor(QPalette.ColorRole.Text, option.palette.color(QPalette.ColorRole.Text))
+        painter.save()
+        painter.translate(rect.left() + self._frame_px, rect.top() + self._frame_px)
+        clip = QRectF(0, 0, rect.width() - 2 * self._frame_px, rect.height() - 2 * self._frame_px)
+        painter.setClipRect(clip)
+        ctx.clip = clip
+        doc.documentLayout().draw(painter, ctx)
+        painter.restore()
+
+    def createEditor(self, parent, option: QStyleOptionViewItem, index: QModelIndex):
+        editor = AutoResizeTextEdit(parent, base_font_pt=self.app.font_pt)
+        editor.requestUrlList.connect(self.app._show_url_list_dialog)
+        # 入力が落ち着いたらモデルへ反映（自動保存の対象にする）
+        timer = QTimer(editor)
+        timer.setSingleShot(True)
+        timer.setInterval(self.COMMIT_DELAY_MS)
+        timer.timeout.connect(lambda ed=editor: self._commit_editor(ed))
+        editor._commit_timer = timer
+        editor.textChanged.connect(timer.start)
+        pidx = QPersistentModelIndex(index)
+        editor._pidx = pidx
+        editor.heightChanged.connect(lambda _h: self.app._queue_row_height(pidx.row()))
+        return editor
+
+    def destroyEditor(self, editor: AutoResizeTextEdit, index: QModelIndex):
+        editor._commit_timer.stop()
+        editor._pidx = None
+        super().destroyEditor(editor, index)
+
+    def editor_heights(self) -> Dict[int, int]:
+        """開いているエディタの必要高さを行ごとに返す（未反映の入力も含めた実際の文字量）"""
+        hs: Dict[int, int] = {}
+        for ed in self.app.table.viewport().findChildren(AutoResizeTextEdit):
+            pidx = getattr(ed, "_pidx", None)
+            if pidx is not None and pidx.isValid():
+                r = pidx.row()
+                hs[r] = max(hs.get(r, 0), ed.measureFullHeight())
+        return hs
+
+    def _commit_editor(self, editor: AutoResizeTextEdit):
+        # ビューが閉じたエディタ（内容は commit 済み）からは反映しない
+        if getattr(editor, "_pidx", None) is not None:
+            self.commitData.emit(editor)
+
+    def flush_pending_commits(self):
+        """反映待ちの入力があれば即座にモデルへ書き込む（保存・終了の直前に呼ぶ）。"""
+        for ed in self.app.table.viewport().findChildren(AutoResizeTextEdit):
+            timer = getattr(ed, "_commit_timer", None)
+            if timer is not None and timer.isActive():
+                timer.stop()
+                self._commit_editor(ed)
+
+    def setEditorData(self, editor: AutoResizeTextEdit, index: QModelIndex):
+        text = index.data(Qt.ItemDataRole.EditRole) or ""
+        # 自身の入力による dataChanged でカーソル位置を失わないよう、差分がある時だけ反映
+        if editor.toPlainText() != text:
+            # モデル由来の文字の反映では反映タイマー（空の commit）や行高の再同期を起こさない
+            # （行高はモデル側の dataChanged／sizeHint で既に合っている）
+            prev = editor.blockSignals(True)
+            try:
+                editor.setPlainText(text)
+                editor._auto_resize()
+            finally:
+                editor.blockSignals(prev)
+
+    def setModelData(self, editor: AutoResizeTextEdit, model: QAbstractTableModel, index: QModelIndex):
+        model.setData(index, editor.toPlainText(), Qt.ItemDataRole.EditRole)
+
+    def updateEditorGeometry(self, editor: AutoResizeTextEdit, option: QStyleOptionViewItem, index: QModelIndex):
+        # 行の高さ（＝その行で最も高いセル）まで文字枠を広げて揃える
+        editor.blockSignals(True)
+        editor.setFixedHeight(max(1, option.rect.height()))
+        editor.blockSignals(False)
+        editor.setGeometry(option.rect)
+
+
 # ---------- メインアプリ ----------
 class CalendarApp(QMainWindow):
     def __init__(self):
@@ -728,8 +1401,34 @@ class CalendarApp(QMainWindow):
             {"id": "col-2", "title": "メモ", "width": 260},
         ]
         self.cells: Dict[str, Dict[str, str]] = {}
+        # 自動保存の差分管理（変更のあった日付キー／差分ログのサイズ／本体 JSON の列構成）
+        self._dirty_keys: Set[str] = set()
+        self._delta_bytes = 0
+        self._base_columns: List[dict] = []
+        # 自動保存の本体 JSON に記録した差分ログの世代（None の間は差分ログを使わない）
+        self._delta_gen: str | None = None
+        # 最後に全体を自動保存した (保存先, 内容のハッシュ) とその世代
+        self._last_autosave_digest = None
+        self._autosave_epoch = 0
         self.font_pt = 11
         self.holidays: Set[str] = set()
+        self._holiday_dates: frozenset = frozenset()
+        # jpholiday の結果を年単位でキャッシュ → {祝日の date}
+        self._jp_year_cache: Dict[int, Set[date]] = {}
+
+        # 検索用コーパス（cells の変更世代・列構成が変わったときだけ作り直す）
+        self._cells_gen = 0
+        # cells の小文字版（検索用。初回検索時に作り、以後はセル確定のたびにその1セルだけ更新）
+        self._cells_lower: Dict[str, Dict[str, str]] | None = None
+        self._search_corpus_cache = None
+        self._search_dialog: SearchDialog | None = None
+        self._month_dialog: MonthPickerDialog | None = None
+
+        # 設定の保存は短時間の連続変更（列幅ドラッグ等）をまとめて1回だけ書き込む
+        self._settings_save_timer = QTimer(self)
+        self._settings_save_timer.setSingleShot(True)
+        self._settings_save_timer.setInterval(SETTINGS_SAVE_DELAY_MS)
+        self._settings_save_timer.timeout.connect(self._save_settings_now)
 
         # 設定ロード & 反映
         self.settings = self._load_settings()
@@ -765,30 +1464,60 @@ class CalendarApp(QMainWindow):
         act_month = menubar.addAction("日付選択")
         act_month.triggered.connect(self.open_month_dialog)
 
-        # テーブル
-        self.table = QTableWidget()
-        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        # テーブル（エディタはフォーカスしたセルにだけ生成する）
+        self.table = QTableView()
+        self.model = CalendarModel(self)
+        self.delegate = CellDelegate(self)
+        self.table.setModel(self.model)
+        self.table.setItemDelegate(self.delegate)
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.AllEditTriggers)
         self.table.verticalHeader().setVisible(False)
         self.table.setAlternatingRowColors(True)
         self.table.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
         root_layout.addWidget(self.table, 1)
 
+        # セル内容が変わったら該当行の高さを合わせる（イベントループ1周分まとめて反映）
+        self._dirty_rows: Set[int] = set()
+        self._row_flush_pending = False
+        self.model.dataChanged.connect(self._on_model_data_changed)
+
         # 幅監視
         self.table.horizontalHeader().sectionResized.connect(self._on_section_resized)
 
         # スクロール監視（端で自動拡張）
-        self.table.verticalScrollBar().valueChanged.connect(self._on_scroll_extend_if_needed)
+        # （1ピクセルごとの valueChanged は1回のイベントループで1回の判定にまとめる）
+        self._scroll_check_pending = False
+        self.table.verticalScrollBar().valueChanged.connect(self._queue_scroll_extend_check)
+        # set_view_anchor 後の先読み（アンカーより前の日）は、レイアウトでスクロール範囲が決まってから行う
+        self._prefetch_anchor: date | None = None
+        self.table.verticalScrollBar().rangeChanged.connect(self._on_scroll_range_changed)
 
         # 初回描画
         self.set_view_anchor(date.today())
 
-        # 自動保存 初期化
+        # 自動保存 初期化（ファイル書き込みは順序を保つため1スレッドのプールで行う）
+        self._autosave_pool = QThreadPool(self)
+        self._autosave_pool.setMaxThreadCount(1)
+        self._autosave_signals = AutosaveSignals(self)
+        self._autosave_signals.failed.connect(self._on_autosave_failed)
+        self._autosave_signals.written.connect(self._on_autosave_written)
         self._dirty = False
+        self._autosave_enabled = False
         self._autosave_timer = QTimer(self)
         self._autosave_timer.timeout.connect(self._autosave_tick)
         self._apply_autosave_settings()
 
     # --- スクロール／表示位置関連 ---
+    @property
+    def range_start(self) -> date:
+        return self._range_start
+
+    @range_start.setter
+    def range_start(self, dt: date):
+        # 行番号⇔日付の変換を整数の引き算で済ませるため序数も保持
+        self._range_start = dt
+        self._range_start_ord = dt.toordinal()
+
     def _ensure_autosave_dir(self):
         """autosave_path の親ディレクトリを必ず作成する。"""
         try:
@@ -808,18 +1537,41 @@ class CalendarApp(QMainWindow):
         end = anchor + timedelta(days=61)  # 約2ヶ月分
         # keep_scroll=False で先頭から描画＝アンカーが上端に来る
         self.rebuild_range(start, end, keep_scroll=False)
+        # アンカーより前が無いと上へのスクロールですぐ端の拡張が走るため、描画後に先に足しておく
+        # （再構築直後は遅延レイアウト前で最上段の行を正しく読めないので、スクロール範囲の更新を待つ）
+        self._prefetch_anchor = anchor
+
+    def _on_scroll_range_changed(self, _lo: int, _hi: int):
+        """レイアウト後にスクロール範囲が決まったら、予約済みの先読みを空き時間に行う。"""
+        if self._prefetch_anchor is not None:
+            QTimer.singleShot(0, self._prefetch_before_anchor)
+
+    def _prefetch_before_anchor(self):
+        """set_view_anchor の後の空き時間に、アンカーの上へ PREFETCH_DAYS 日を足す（最上段は維持）。"""
+        anchor, self._prefetch_anchor = self._prefetch_anchor, None
+        # その間に別の日へ移動・再構築・スクロールされていたら何もしない
+        if anchor is None or self.range_start != anchor or self._get_top_visible_date() != anchor:
+            return
+        self._prepend_days(PREFETCH_DAYS)
 
     def _get_top_visible_date(self) -> date:
         """現在のテーブルで最上段に見えている日付を返す。"""
         top_row = self.table.rowAt(0)
         if top_row < 0:
             top_row = 0
-        return self.range_start + timedelta(days=top_row)
+        return date.fromordinal(self._range_start_ord + top_row)
 
     def _begin_table_update(self):
-        """テーブル全面更新の前に呼ぶ：スクロール信号を止め、再入を防止。"""
+        """
+        テーブル全面更新の前に呼ぶ：再描画とスクロール信号を止め、再入を防止。
+        必ず try/finally で _end_table_update と対にする。モデルのシグナルは止めない
+        （modelReset 等がビューに届かないと行・列の情報が古いまま残る）。
+        """
         self._ensure_flags()
         self._is_building = True
+        # 外側で既に再描画を止めている場合はそれを尊重して戻せるよう退避
+        self._prev_updates = self.table.updatesEnabled()
+        self.table.setUpdatesEnabled(False)
         try:
             bar = self.table.verticalScrollBar()
             self._sb_prev_block = bar.blockSignals(True)
@@ -827,39 +1579,56 @@ class CalendarApp(QMainWindow):
             self._sb_prev_block = False
 
     def _end_table_update(self):
-        """テーブル全面更新の後に呼ぶ：スクロール信号を元に戻す。"""
+        """テーブル全面更新の後に呼ぶ：スクロール信号と再描画を元に戻す。"""
         try:
             bar = self.table.verticalScrollBar()
             bar.blockSignals(self._sb_prev_block)
         except Exception:
             pass
+        # 再描画を戻すと、その時点でまとめて1回だけ描き直される
+        self.table.setUpdatesEnabled(getattr(self, "_prev_updates", True))
         self._is_building = False
 
      # --- 列／サイズ関連 ---
     def _sync_row_height(self, row: int):
         """
-        指定行の各セル(QTextEdit)の必要高さを計測し、
-        1) 行全体の高さを最大に統一
-        2) 各列のエディタの高さも最大に合わせる（＝文字枠も揃える）
-        3) +1px の安全マージンで“隙間”発生を抑止
+        指定行の各セルの必要高さ（デリゲートの sizeHint／編集中エディタ）の最大に
+        行全体の高さを合わせる。編集中のエディタは updateEditorGeometry で行の高さへ揃う。
         """
-        max_h = 36
-        editors = []
-        for ci in range(1, self.table.columnCount()):
-            w = self.table.cellWidget(row, ci)
-            if isinstance(w, AutoResizeTextEdit):
-                h = w.measureFullHeight()
-                max_h = max(max_h, h)
-                editors.append(w)
-
-        # 行全体を +1px で設定
-        self.table.setRowHeight(row, max_h + 1)
-
-        # 各エディタも最大に合わせる
-        for ed in editors:
-            ed.blockSignals(True)
-            ed.setFixedHeight(max_h + 1)
-            ed.blockSignals(False)
+        self._sync_row_heights((row,))
+
+    def _sync_row_heights(self, rows):
+        """複数行の行高をまとめて同期（エディタの走査は1回だけ）。"""
+        n = self.model.rowCount()
+        # sizeHintForRow は編集中エディタ（モデル未反映の入力）を考慮しないため別途加味する
+        eds = self.delegate.editor_heights()
+        grid = 1 if self.table.showGrid() else 0
+        for row in rows:
+            if row < 0 or row >= n:
+                continue
+            h = self.table.sizeHintForRow(row)
+            if row in eds:
+                h = max(h, eds[row] + grid)
+            self.table.setRowHeight(row, h)
+
+    def _on_model_data_changed(self, top_left: QModelIndex, bottom_right: QModelIndex, roles=()):
+        # 日付列だけの変更（祝日の色替えなど）は行高に影響しない
+        if bottom_right.column() < 1:
+            return
+        for r in range(top_left.row(), bottom_right.row() + 1):
+            self._queue_row_height(r)
+
+    def _queue_row_height(self, row: int):
+        """行高の再計算を予約する。同じイベントループ内の要求は1回の flush にまとめる。"""
+        self._dirty_rows.add(row)
+        if not self._row_flush_pending:
+            self._row_flush_pending = True
+            QTimer.singleShot(0, self._flush_row_heights)
+
+    def _flush_row_heights(self):
+        self._row_flush_pending = False
+        rows, self._dirty_rows = self._dirty_rows, set()
+        self._sync_row_heights(sorted(rows))
             
     def _on_section_resized(self, index: int, old_size: int, new_size: int):
         # 右端の項目列(=データ列)のみ保存（0列目は日付列）
@@ -878,18 +1647,22 @@ class CalendarApp(QMainWindow):
         if top < 0:
             top = 0
         if bot < 0:
-            bot = self.table.rowCount() - 1
+            bot = self.model.rowCount() - 1
 
-        for r in range(top, bot + 1):
-            self._sync_row_height(r)
+        self._sync_row_heights(range(top, bot + 1))
             
     def _recalc_all_row_heights(self):
-        # 1周目
-        for r in range(self.table.rowCount()):
-            self._sync_row_height(r)
-        # 2周目（レイアウト反映直後の微妙なズレを吸収）
-        for r in range(self.table.rowCount()):
-            self._sync_row_height(r)
+        # 行高はデリゲートの sizeHint から決まるため1パスで確定する（途中状態は描かない）
+        was_enabled = self.table.updatesEnabled()
+        self.table.setUpdatesEnabled(False)
+        try:
+            self.table.resizeRowsToContents()
+            # resizeRowsToContents は編集中エディタ（未反映の入力）を見ないので、その行だけ補正
+            eds = self.delegate.editor_heights()
+            if eds:
+                self._sync_row_heights(sorted(eds))
+        finally:
+            self.table.setUpdatesEnabled(was_enabled)
 
            
     def get_current_column_widths(self) -> dict:
@@ -944,8 +1717,7 @@ class CalendarApp(QMainWindow):
     def _load_settings(self) -> dict:
         if SETTINGS_PATH.exists():
             try:
-                with SETTINGS_PATH.open("r", encoding="utf-8") as f:
-                    return json.load(f)
+                return json_load_path(SETTINGS_PATH)
             except Exception:
                 pass
         cols_copy = [dict(c) for c in self.columns]
@@ -961,6 +1733,11 @@ class CalendarApp(QMainWindow):
 
 
     def _save_settings(self):
+        """設定の保存を予約する（SETTINGS_SAVE_DELAY_MS 以内の再要求はまとめて1回の書き込みにする）。"""
+        self._settings_save_timer.start()
+
+    def _save_settings_now(self):
+        self._settings_save_timer.stop()
         self.settings["font_pt"] = self.font_pt
         self.settings["columns"] = self.columns
         self.settings.setdefault("holidays", "")
@@ -969,15 +1746,20 @@ class CalendarApp(QMainWindow):
         self.settings.setdefault("autosave_path", str(self.autosave_path))
         self.settings.setdefault("theme", self.settings.get("theme", "light"))
         try:
-            with SETTINGS_PATH.open("w", encoding="utf-8") as f:
-                json.dump(self.settings, f, ensure_ascii=False, indent=2)
+            blob = json_dumps_bytes(self.settings)
+            # 前回書き込んだ内容と同じならディスクへは書かない
+            if blob == getattr(self, "_last_settings_blob", None):
+                return
+            # 書き込み途中で落ちても前回の設定が残るよう一時ファイル経由で置き換える
+            atomic_write_bytes(SETTINGS_PATH, blob)
+            self._last_settings_blob = blob
         except Exception:
             pass
 
     def _apply_settings_boot(self):
         self.font_pt = int(self.settings.get("font_pt", 11))
         self.columns = list(self.settings.get("columns", self.columns))
-        self.holidays = parse_holidays_str(self.settings.get("holidays", ""))
+        self._set_holidays(parse_holidays_str(self.settings.get("holidays", "")))
         self.expand_each = int(self.settings.get("expand_days_each", 60))
 
     # ---------- テーマ ----------
@@ -988,7 +1770,7 @@ class CalendarApp(QMainWindow):
         if theme == "dark":
             css = """
             QWidget { background-color: #1f2430; color: #e6e6e6; }
-            QTableWidget, QTreeWidget, QTextEdit, QLineEdit { background-color: #2a2f3a; selection-background-color: #3b4252; }
+            QTableView, QTreeWidget, QTextEdit, QLineEdit { background-color: #2a2f3a; selection-background-color: #3b4252; }
             QHeaderView::section { background-color: #2f3441; color: #e6e6e6; }
             QMenuBar { background-color: #2a2f3a; }
             QMenuBar::item:selected { background: #3b4252; }
@@ -1013,8 +1795,7 @@ class CalendarApp(QMainWindow):
         不正値はデフォルトにフォールバックし、壊れている場合は読み込みを中断する。
         """
         try:
-            with open(path, "r", encoding="utf-8") as f:
-                obj = json.load(f)
+            obj = json_load_path(path)
 
             # columns: [{id,title,width}]
             cols_raw = obj.get("columns", self.columns)
@@ -1027,6 +1808,7 @@ class CalendarApp(QMainWindow):
                     cid = str(c.get("id") or "").strip() or str(uuid.uuid4())
                     if cid in seen:
                         cid = cid + "-" + uuid.uuid4().hex[:4]
+                    cid = sys.intern(cid)
                     seen.add(cid)
                     title = str(c.get("title") or cid)
                     try:
@@ -1039,37 +1821,49 @@ class CalendarApp(QMainWindow):
             if not cols:
                 raise ValueError("columns が不正です")
 
-            # cells: {"YYYY-MM-DD": {col_id: str}}
+            # cells: {"YYYY-MM-DD": {col_id: str}}（自動保存は列配列形式 cells_soa）
             cells_raw = obj.get("cells", self.cells)
             cells = {}
-            if isinstance(cells_raw, dict):
+            if "cells_soa" in obj:
+                cells = soa_to_cells(obj["cells_soa"])
+            elif isinstance(cells_raw, dict):
                 for k, v in cells_raw.items():
-                    if not (isinstance(k, str) and re.fullmatch(r"\d{4}-\d{2}-\d{2}", k)):
+                    if not (isinstance(k, str) and DATE_RE.fullmatch(k)):
                         continue
-                    if not isinstance(v, dict):
+                    entry = clean_cells_row(v)
+                    if entry is None:
                         continue
-                    entry = {}
-                    for cid, txt in v.items():
-                        if not isinstance(cid, str):
-                            continue
-                        entry[cid] = "" if txt is None else str(txt)
-                    cells[k] = entry
+                    cells[sys.intern(k)] = entry
 
             if cells is None:
                 cells = {}
 
+            # 差分ログ（前回終了時に書き戻されなかった自動保存分）があれば上書き適用
+            # （本体と同じ世代の行だけ。アプリ専用の自動保存ファイル以外は差分ログを持たない）
+            delta_gen = obj.get("delta_gen")
+            if not (isinstance(delta_gen, str) and is_private_autosave(path)):
+                delta_gen = None
+            delta_bytes = self._replay_delta(path, cells, delta_gen)
+
             # 反映
             self.columns = cols
             self.cells = cells
+            self._cells_gen += 1
+            self._cells_lower = None
+            self._forget_autosave_digest()
 
-            # year/month があれば、その月初から2ヶ月を初期表示に
+            # year/month があれば、その月初をアンカー（最上段に表示する日）にする
+            # （表示範囲は呼び出し側が set_view_anchor で作り直す）
             y = obj.get("year", None)
             m = obj.get("month", None)
             if isinstance(y, int) and isinstance(m, int) and 1 <= m <= 12:
-                ms = date(y, m, 1)
-                self.range_start = ms
-                self.range_end = ms + timedelta(days=61)
+                self.current_anchor_date = date(y, m, 1)
             self._dirty = False
+            self._dirty_keys = set()
+            self._delta_bytes = delta_bytes
+            self._delta_gen = delta_gen
+            # 本体 JSON の列構成（差分ログは列構成が同じ間だけ追記できる）
+            self._base_columns = [dict(c) for c in cols]
             return True
 
         except Exception as e:
@@ -1084,25 +1878,46 @@ class CalendarApp(QMainWindow):
         if sp:
             candidates.append(Path(sp))
         candidates.append(DEFAULT_AUTOSAVE)
+        # 存在確認はせずに直接開く（無ければ open が失敗して次の候補へ）
         for p in candidates:
-            if p.exists():
-                if self._load_json_path(p, silent=True):
-                    self.autosave_path = p
-                    break
+            if self._load_json_path(p, silent=True):
+                self.autosave_path = p
+                break
 
     # ---------- テーブル構築（範囲全面再構築） ----------
+    def _set_holidays(self, holidays: Set[str]):
+        """手動祝日（"YYYY-MM-DD" の集合）を設定し、判定用の date 集合も作り直す。"""
+        self.holidays = set(holidays)
+        dates = set()
+        for s in self.holidays:
+            try:
+                dates.add(date.fromisoformat(s))
+            except ValueError:
+                continue
+        self._holiday_dates = frozenset(dates)
+        model = getattr(self, "model", None)
+        if model is not None:
+            model.refresh_row_meta()
+
+    def _ensure_year_holidays(self, y: int) -> Set[date]:
+        """jpholiday による y 年の祝日集合。年ごとに初回だけ year_holidays で計算する。"""
+        days = self._jp_year_cache.get(y)
+        if days is None:
+            days = set()
+            try:
+                if HAS_JPHOLIDAY:
+                    days = {d for d, _name in jpholiday.year_holidays(y)}
+            except Exception:
+                pass
+            self._jp_year_cache[y] = days
+        return days
+
     def _is_holiday_jp(self, dt: date) -> bool:
         """
-        日本の祝日を判定。jpholiday があればそちらを優先し、無い場合は
-        設定で入力された self.holidays（"YYYY-MM-DD" の集合）を見る。
+        日本の祝日を判定。設定で入力された手動祝日（date の集合）と、
+        jpholiday があればその結果（年単位キャッシュ）を見る。
         """
-        try:
-            if HAS_JPHOLIDAY and jpholiday.is_holiday(dt):
-                return True
-        except Exception:
-            pass
-        # フォールバック（手入力祝日）
-        return dt.strftime("%Y-%m-%d") in self.holidays
+        return dt in self._holiday_dates or dt in self._ensure_year_holidays(dt.year)
 
     def rebuild_range(self, start: date, end: date, keep_scroll: bool):
         """start..end を全面再構築。keep_scroll=True なら元の先頭行を維持"""
@@ -1116,44 +1931,30 @@ class CalendarApp(QMainWindow):
 
         # keep_scroll の場合は現在の最上段に見えている日付をアンカーとして退避
         anchor_dt = None
-        if keep_scroll and self.table.rowCount() > 0:
+        if keep_scroll and self.model.rowCount() > 0:
             top_row = self.table.rowAt(0)
             if top_row < 0:
                 top_row = 0
             anchor_dt = self.range_start + timedelta(days=top_row)
+        elif not keep_scroll:
+            # 先頭から描画する場合は、スクロール信号を止める前に最上段へ戻しておく
+            # （止めた間に値だけ 0 へ変わると、ビューの表示位置が古いまま残る）
+            self.table.scrollToTop()
 
         self._begin_table_update()
         try:
-            self.range_start, self.range_end = start, end
-            total_days = (end - start).days + 1
-
-            # ヘッダ設定（列タイトルは設定を使用）
-            headers = ["日付"] + [c["title"] for c in self.columns]
-            self.table.clear()
-            self.table.setColumnCount(1 + len(self.columns))
-            self.table.setRowCount(total_days)
-            self.table.setHorizontalHeaderLabels(headers)
-
-            # 0列目（日付）は固定幅、以降は settings/self.columns の width を反映
-            self.table.setColumnWidth(0, 120)
-            for i, col in enumerate(self.columns, start=1):
-                w = int(col.get("width", 240))
-                w = max(COLUMN_WIDTH_MIN, min(w, COLUMN_WIDTH_MAX))  # 安全な最小/最大幅
-                self.table.setColumnWidth(i, w)
+            # 範囲・列構成（ヘッダ含む）をモデルごと差し替え
+            self.model.set_range(start, end)
 
-            # 本体行の構築
-            cur = start
-            for r in range(total_days):
-                self._build_row(r, cur)
-                cur += timedelta(days=1)
+            self._apply_column_widths()
 
-            # 全セルにフォントサイズを適用
-            self._apply_font_all(self.font_pt)
+            # フォントサイズはデリゲートが font_pt から描画・高さ計算する
+            # （モデルのリセットで開いていたエディタは閉じられるので、個別の再設定は不要）
 
         finally:
             self._end_table_update()
 
-        # 高さを全行で同期（2パス）
+        # 高さを全行で同期
         self._recalc_all_row_heights()
 
         # keep_scroll の場合は表示位置を元に戻す（最上段固定）
@@ -1161,71 +1962,27 @@ class CalendarApp(QMainWindow):
             self.scroll_to_date(anchor_dt)
 
     
+    def _apply_column_widths(self):
+        """
+        0列目（日付）は固定幅、以降は settings/self.columns の width を反映
+        （幅は self.columns 由来なので列ごとの sectionResized 処理＝保存・行高再計算は不要）
+        """
+        header = self.table.horizontalHeader()
+        prev_hdr = header.blockSignals(True)
+        try:
+            self.table.setColumnWidth(0, 120)
+            for i, col in enumerate(self.columns, start=1):
+                w = int(col.get("width", 240))
+                w = max(COLUMN_WIDTH_MIN, min(w, COLUMN_WIDTH_MAX))  # 安全な最小/最大幅
+                if self.table.columnWidth(i) != w:
+                    self.table.setColumnWidth(i, w)
+        finally:
+            header.blockSignals(prev_hdr)
+
     def rebuild_all(self):
         """列名/幅や祝日変更などの際に、現在範囲を描画し直す"""
         self.rebuild_range(self.range_start, self.range_end, keep_scroll=True)
 
-    def _build_row(self, row: int, dt: date):
-        key = dt.strftime("%Y-%m-%d")
-        w = dt.weekday()  # 月=0..日=6
-        label = f"{dt.month}月{str(dt.day).zfill(2)}日({JP_WEEK[w]})"
-
-        # --- 日付セル ---
-        it = QTableWidgetItem(label)
-        it.setFlags(Qt.ItemFlag.ItemIsEnabled)
-
-        is_holiday = self._is_holiday_jp(dt)
-        is_sun = (w == 6)
-        is_sat = (w == 5)
-
-        # 色付け（日祝ピンク・土曜水色）
-        PINK_BG, PINK_FG = QColor("#FCE4EC"), QColor("#AD1457")
-        BLUE_BG, BLUE_FG = QColor("#E3F2FD"), QColor("#0D47A1")
-
-        if is_holiday or is_sun:
-            it.setBackground(PINK_BG)
-            it.setForeground(PINK_FG)
-        elif is_sat:
-            it.setBackground(BLUE_BG)
-            it.setForeground(BLUE_FG)
-
-        self.table.setItem(row, 0, it)
-
-        # --- 入力セル ---
-        editors = []
-        for ci, col in enumerate(self.columns, start=1):
-            editor = AutoResizeTextEdit(base_font_pt=self.font_pt)
-            if key in self.cells and col["id"] in self.cells[key]:
-                editor.setPlainText(self.cells[key][col["id"]])
-
-            editor.requestUrlList.connect(self._show_url_list_dialog)
-
-            def make_slot(k=key, col_id=col["id"], ed=editor):
-                def _slot():
-                    self.cells.setdefault(k, {})[col_id] = ed.toPlainText()
-                    self._mark_dirty()
-                return _slot
-            editor.textChanged.connect(make_slot())
-
-            self.table.setCellWidget(row, ci, editor)
-            editors.append(editor)
-
-        # 各エディタの高さ変化で都度再計算
-        for ed in editors:
-            ed.heightChanged.connect(lambda _h, r=row: self._sync_row_height(r))
-
-        # ここで即時に一度だけ同期（singleShotを廃止）
-        self._sync_row_height(row)
-
-    
-    def _apply_font_all(self, pt: int):
-        self.font_pt = int(pt)
-        for r in range(self.table.rowCount()):
-            for c in range(1, self.table.columnCount()):
-                w = self.table.cellWidget(r, c)
-                if isinstance(w, AutoResizeTextEdit):
-                    w.setPointSize(self.font_pt)
-
     # ---------- スクロール端で動的拡張 ----------
     def _on_scroll_action(self, action: int):
         """
@@ -1236,6 +1993,16 @@ class CalendarApp(QMainWindow):
         self._user_scroll_expire_ms = int(QGuiApplication.primaryScreen().refreshRate() or 60) * 4
         self._last_user_scroll_ms = QDateTime.currentMSecsSinceEpoch()
     
+    def _queue_scroll_extend_check(self, _value: int):
+        """端での自動拡張の判定を予約する。同じイベントループ内のスクロールは1回の判定にまとめる。"""
+        if not self._scroll_check_pending:
+            self._scroll_check_pending = True
+            QTimer.singleShot(0, self._flush_scroll_extend_check)
+
+    def _flush_scroll_extend_check(self):
+        self._scroll_check_pending = False
+        self._on_scroll_extend_if_needed(self.table.verticalScrollBar().value())
+
     def _on_scroll_extend_if_needed(self, value: int):
         """
         スクロール端で日付範囲を自動拡張する。ただし
@@ -1278,18 +2045,18 @@ class CalendarApp(QMainWindow):
         self._ensure_flags()
         self._is_extending = True
         try:
-            # スクロール信号を止めて拡張（連鎖抑止）
+            # スクロール信号と再描画を止めて拡張（連鎖抑止・途中状態を描かない）
             bar = self.table.verticalScrollBar()
             prev = bar.blockSignals(True)
+            self.table.setUpdatesEnabled(False)
             try:
-                start_row = self.table.rowCount()
-                self.table.setRowCount(start_row + n)
-                dt = self.range_end + timedelta(days=1)
-                for i in range(n):
-                    self._build_row(start_row + i, dt)
-                    dt += timedelta(days=1)
-                self.range_end += timedelta(days=n)
+                # 行の追加通知（rowsInserted）は1回、行高も1パスでまとめて設定
+                start_row = self.model.rowCount()
+                self.model.append_days(n)
+                self._sync_row_heights(range(start_row, start_row + n))
+                self._trim_range(keep_end=True)
             finally:
+                self.table.setUpdatesEnabled(True)
                 bar.blockSignals(prev)
         finally:
             self._is_extending = False
@@ -1303,6 +2070,7 @@ class CalendarApp(QMainWindow):
         try:
             bar = self.table.verticalScrollBar()
             prev = bar.blockSignals(True)
+            self.table.setUpdatesEnabled(False)
             try:
                 # いまのトップ可視行に対応する日付を保存（後で戻す）
                 top_row_before = self.table.rowAt(0)
@@ -1310,22 +2078,35 @@ class CalendarApp(QMainWindow):
                     top_row_before = 0
                 anchor_dt = self.range_start + timedelta(days=top_row_before)
 
-                for _ in range(n):
-                    self.table.insertRow(0)
-
-                dt = self.range_start - timedelta(days=n)
-                for r in range(n):
-                    self._build_row(r, dt)
-                    dt += timedelta(days=1)
-                self.range_start -= timedelta(days=n)
+                self.model.prepend_days(n)
+                self._sync_row_heights(range(n))
+                self._trim_range(keep_end=False)
 
                 # 元の位置に戻す（最上段へ）
                 self.scroll_to_date(anchor_dt)
             finally:
+                self.table.setUpdatesEnabled(True)
                 bar.blockSignals(prev)
         finally:
             self._is_extending = False
 
+    def _trim_range(self, keep_end: bool):
+        """
+        行数が MAX_RANGE_DAYS を超えたら反対側の端の行を捨てる。
+        keep_end=True なら先頭側を、False なら末尾側を削る（最上段の日付は維持）。
+        """
+        excess = self.model.rowCount() - MAX_RANGE_DAYS
+        if excess <= 0:
+            return
+        # 削られる行で編集中の入力を失わないよう先に反映
+        self.delegate.flush_pending_commits()
+        if keep_end:
+            anchor_dt = self._get_top_visible_date()
+            self.model.drop_front(excess)
+            self.scroll_to_date(anchor_dt)
+        else:
+            self.model.drop_back(excess)
+
     def _append_days_auto(self, n: int):
         """
         末尾側に n 日自動拡張。拡張中はスクロールシグナルを一時停止して再帰発火を抑止。
@@ -1333,8 +2114,8 @@ class CalendarApp(QMainWindow):
         bar = self.table.verticalScrollBar()
         prev = bar.blockSignals(True)
         try:
-            end = self.range_end + timedelta(days=n)
-            self.rebuild_range(self.range_start, end, keep_scroll=True)
+            # 追加する n 行だけを挿入（保持日数の上限を超える分は _trim_range が先頭側を捨てる）
+            self._append_days(n)
         finally:
             bar.blockSignals(prev)
         self._recalc_visible_rows()
@@ -1346,9 +2127,8 @@ class CalendarApp(QMainWindow):
         bar = self.table.verticalScrollBar()
         prev = bar.blockSignals(True)
         try:
-            start = self.range_start - timedelta(days=n)
-            # 先頭拡張時のアンカーは「拡張前の最上段」を維持
-            self.rebuild_range(start, self.range_end, keep_scroll=True)
+            # 先頭へ n 行だけを挿入し、拡張前の最上段を維持（上限超過分は末尾側を捨てる）
+            self._prepend_days(n)
         finally:
             bar.blockSignals(prev)
         self._recalc_visible_rows()
@@ -1356,12 +2136,20 @@ class CalendarApp(QMainWindow):
 
     # ---------- ユーティリティ ----------
     def ensure_date_visible(self, target: date):
-        """target が表示範囲に入るまで前後に拡張"""
-        # 必要に応じて60日単位で伸ばす
-        while target < self.range_start:
-            self._prepend_days(60)
-        while target > self.range_end:
-            self._append_days(60)
+        """target が表示範囲に入るよう、必要な日数だけ一度で前後に拡張"""
+        if target < self.range_start:
+            need = (self.range_start - target).days
+        elif target > self.range_end:
+            need = (target - self.range_end).days
+        else:
+            return
+        # 保持日数の上限を超える距離なら、伸ばさずに target から約2ヶ月を作り直す
+        if need >= MAX_RANGE_DAYS:
+            self.rebuild_range(target, target + timedelta(days=61), keep_scroll=False)
+        elif target < self.range_start:
+            self._prepend_days(max(60, need))
+        else:
+            self._append_days(max(60, need))
 
     def scroll_to_date(self, dt: date):
         """
@@ -1370,18 +2158,43 @@ class CalendarApp(QMainWindow):
         """
         if dt < self.range_start or dt > self.range_end:
             return
-        idx = (dt - self.range_start).days
-        it = self.table.item(idx, 0)
-        if it:
-            self.table.scrollToItem(it, QAbstractItemView.ScrollHint.PositionAtTop)
+        # 範囲内なら行は必ず存在するので、モデルの index からそのままスクロール
+        idx = dt.toordinal() - self._range_start_ord
+        self.table.scrollTo(self.model.index(idx, 0), QAbstractItemView.ScrollHint.PositionAtTop)
 
 
     # ---------- ダイアログ起動 ----------
+    def _note_lower(self, key: str, col_id: str, text: str):
+        """確定したセルの小文字版を更新（検索で全セルを小文字化し直さないため）"""
+        if self._cells_lower is not None:
+            self._cells_lower.setdefault(key, {})[col_id] = text.lower()
+
+    def search_corpus(self):
+        """build_search_corpus の結果。変更がなければ前回のものを返す。"""
+        col_ids = [c["id"] for c in self.columns]
+        tag = (self._cells_gen, col_ids)
+        cache = self._search_corpus_cache
+        if cache is None or cache[0] != tag:
+            if self._cells_lower is None:
+                self._cells_lower = {
+                    k: {cid: t.lower() for cid, t in row.items()} for k, row in self.cells.items()
+                }
+            cache = (tag, build_search_corpus(self.cells, self._cells_lower, col_ids))
+            self._search_corpus_cache = cache
+        return cache[1]
+
+    # 検索・日付選択は一度作ったダイアログを使い回す（毎回のウィジェット構築を省く）
     def open_search_dialog(self):
-        SearchDialog(self).exec()
+        if self._search_dialog is None:
+            self._search_dialog = SearchDialog(self)
+        self._search_dialog.reset()
+        self._search_dialog.exec()
 
     def open_month_dialog(self):
-        MonthPickerDialog(self).exec()
+        if self._month_dialog is None:
+            self._month_dialog = MonthPickerDialog(self)
+        self._month_dialog.reset()
+        self._month_dialog.exec()
 
     def _show_url_list_dialog(self, urls: List[str]):
         if not urls:
@@ -1390,24 +2203,147 @@ class CalendarApp(QMainWindow):
         UrlListDialog(urls, self).exec()
 
     # ---------- 保存/読込 ----------
-    def _write_json(self, path: Path):
+    def _write_json(self, path: Path, pretty: bool = True) -> bool:
         """
         安全なアトミック書き込みを行う。
         一時ファイルへの保存後、rename/replace で本体へ反映する。
+        pretty=False（自動保存）は整形しない。cells を列配列形式（cells_soa）にするのは
+        アプリ専用の自動保存ファイルだけで、ユーザーのファイルは常に標準の cells 形式で書く。
+        本体に全内容を書いたので、その隣の差分ログは不要になり削除する。
         """
+        # 書き込み順を守るため、実行中の自動保存を待ってから書く
+        self._autosave_pool.waitForDone()
+        # 差分ログを使うのはアプリ専用の自動保存ファイルだけ（書き直すたびに世代を新しくする）
+        private = is_private_autosave(path)
+        gen = new_delta_gen() if private else None
         try:
-            path.parent.mkdir(parents=True, exist_ok=True)
-            tmp = path.with_suffix(path.suffix + ".tmp")
-            with tmp.open("w", encoding="utf-8") as f:
-                json.dump({"columns": self.columns, "cells": self.cells}, f, ensure_ascii=False, indent=2)
-            tmp.replace(path)
+            snap = build_snapshot(self.columns, self.cells, compact=private and not pretty, delta_gen=gen)
+            if not HAS_ORJSON and len(self.cells) >= STREAM_SAVE_MIN_DAYS:
+                atomic_write_json_stream(path, snap, indent=pretty)
+            else:
+                atomic_write_bytes(path, json_dumps_bytes(snap, indent=pretty))
+            delta_path_for(path).unlink(missing_ok=True)
         except Exception as e:
             QMessageBox.warning(self, "保存失敗", str(e))
+            return False
+        self._dirty_keys = set()
+        self._delta_bytes = 0
+        self._delta_gen = gen
+        self._base_columns = [dict(c) for c in self.columns]
+        self._forget_autosave_digest()
+        return True
+
+    def _replay_delta(self, path: Path, cells: Dict[str, Dict[str, str]], gen: str | None) -> int:
+        """
+        path の差分ログ（1行 = {"gen": 世代, "key": "YYYY-MM-DD", "cells": {col_id: str}}）を
+        cells へ順に上書きする。本体 JSON と世代(gen)が違う行（本体の書き直し後に消し損ねた
+        古いログ）と壊れた行（書き込み途中の末尾など）は読み飛ばす。
+        差分ログのサイズ(バイト)を返す。
+        """
+        dp = delta_path_for(path)
+        if not dp.exists():
+            return 0
+        if gen is None:
+            return dp.stat().st_size
+        with dp.open("r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    continue
+                if not isinstance(rec, dict) or rec.get("gen") != gen:
+                    continue
+                k = rec.get("key")
+                if not (isinstance(k, str) and DATE_RE.fullmatch(k)):
+                    continue
+                entry = clean_cells_row(rec.get("cells"))
+                if entry is None:
+                    continue
+                if entry:
+                    cells[sys.intern(k)] = entry
+                else:
+                    cells.pop(k, None)  # その日の入力がすべて消された
+        return dp.stat().st_size
+
+    def _append_delta(self, path: Path):
+        """変更のあった日(_dirty_keys)だけを差分ログへ追記する（書き込みはワーカーで行う）。"""
+        keys = sorted(self._dirty_keys)
+        gen = self._delta_gen
+        buf = b"".join(
+            json_dumps_bytes({"gen": gen, "key": k, "cells": self.cells.get(k, {})}, indent=False) + b"\n"
+            for k in keys
+        )
+        self._autosave_pool.start(AutosaveTask(path, buf, True, self._autosave_signals))
+        self._forget_autosave_digest()
+        self._dirty_keys = set()
+        self._delta_bytes += len(buf)
+
+    def _submit_full_autosave(self, path: Path):
+        """全体の自動保存。UIスレッドは浅いコピーだけ取り、シリアライズ以降はワーカーで行う。"""
+        gen = None
+        private = is_private_autosave(path)
+        if private:
+            # 差分ログを書いた後（消し損ねが残りうる）は世代を変える。変わらなければ
+            # 内容が同じ時に書き込みを省いても、本体の世代とメモリ上の世代は一致したまま
+            gen = self._delta_gen
+            if gen is None or self._delta_bytes > 0:
+                gen = new_delta_gen()
+        self._autosave_pool.start(SnapshotAutosaveTask(
+            path, [dict(c) for c in self.columns], dict(self.cells), private, gen,
+            self._last_autosave_digest, self._autosave_epoch, self._autosave_signals,
+        ))
+        self._dirty_keys = set()
+        self._delta_bytes = 0
+        self._delta_gen = gen
+        self._base_columns = [dict(c) for c in self.columns]
+
+    def _forget_autosave_digest(self):
+        """ディスク上の内容が最後の全体自動保存と一致する保証がなくなったときに呼ぶ。"""
+        self._last_autosave_digest = None
+        # 受付済みワーカーの完了通知で古いハッシュを書き戻さないよう世代を進める
+        self._autosave_epoch += 1
+
+    def _on_autosave_written(self, digest, epoch: int):
+        if epoch == self._autosave_epoch:
+            self._last_autosave_digest = digest
+
+    def _on_autosave_failed(self, msg: str):
+        # 次回は全体を書き直す（差分ログの前提が崩れている可能性がある）
+        self._dirty = True
+        self._base_columns = []
+        self._forget_autosave_digest()
+        self._resume_autosave_timer()
+        QMessageBox.warning(self, "保存失敗", msg)
+
+    def _compact_autosave(self):
+        """差分ログ（や未保存の変更）があれば本体 JSON を書き直して1ファイルにまとめる。"""
+        if self.autosave_path and (
+            getattr(self, "_dirty", False) or delta_path_for(self.autosave_path).exists()
+        ):
+            # ユーザーのファイルは「保存」と同じ整形済みの形で書き戻す
+            if self._write_json(self.autosave_path, pretty=not is_private_autosave(self.autosave_path)):
+                self._dirty = False
+
+    def _can_append_delta(self) -> bool:
+        """
+        アプリ専用の自動保存ファイルで、世代付きの本体 JSON があり、列構成が変わっておらず、
+        差分ログが肥大していなければ追記で済ませる。
+        （ユーザーが選んだファイルは、それ単体で最新になるよう毎回全体を書く）
+        """
+        return (
+            bool(self._dirty_keys)
+            and self._delta_gen is not None
+            and is_private_autosave(self.autosave_path)
+            and self.autosave_path.exists()
+            and self._base_columns == self.columns
+            and self._delta_bytes <= AUTOSAVE_DELTA_MAX_BYTES
+        )
 
     def save_json(self):
         path, _ = QFileDialog.getSaveFileName(self, "スケジュールを保存", "", "JSON (*.json)")
         if not path:
             return
+        self.delegate.flush_pending_commits()
         self._write_json(Path(path))
         self.autosave_path = Path(path)
         self.settings["autosave_path"] = str(self.autosave_path)
@@ -1418,14 +2354,26 @@ class CalendarApp(QMainWindow):
         path, _ = QFileDialog.getOpenFileName(self, "スケジュールを読み込み", "", "JSON (*.json)")
         if not path:
             return
+        self._autosave_pool.waitForDone()
+        prev_cols = [(c.get("id"), c.get("title"), c.get("width")) for c in self.columns]
         if self._load_json_path(Path(path), silent=False):
-            # 読み込んだ year/month に基づく2ヶ月へ置換
-            self.rebuild_range(self.range_start, self.range_start + timedelta(days=61), keep_scroll=False)
+            # 読み込んだ year/month（無ければ今のアンカー）を最上段にした2ヶ月へ置換
+            anchor = self.current_anchor_date
+            end = anchor + timedelta(days=61)
+            # 先読みや端の拡張で今の範囲は2ヶ月より広いので、一致ではなく包含で比べる
+            if self.range_start <= anchor and end <= self.range_end and [
+                (c.get("id"), c.get("title"), c.get("width")) for c in self.columns
+            ] == prev_cols:
+                # 表示する2ヶ月が今の範囲に収まり列も同じなら作り直さず、セルの内容と行高だけ更新
+                self.model.refresh_cells()
+                self._recalc_all_row_heights()
+                self.scroll_to_date(anchor)
+            else:
+                self.set_view_anchor(anchor)
             self.autosave_path = Path(path)
             self.settings["autosave_path"] = str(self.autosave_path)
             self._save_settings()
             self._dirty = False
-            self.current_anchor_date = self.range_start
 
     def open_settings(self):
         dlg = SettingsDialog(self, self.settings)
@@ -1437,6 +2385,12 @@ class CalendarApp(QMainWindow):
             top_anchor = self.range_start
 
         def on_applied(s: dict):
+            # 変更前の列構成・幅・フォント（変わった部分だけ反映するため）
+            prev_ids = [c.get("id") for c in self.columns]
+            prev_titles = [c.get("title") for c in self.columns]
+            prev_widths = [c.get("width") for c in self.columns]
+            prev_font = self.font_pt
+
             # 受け取った設定を反映
             self.settings = dict(s)
 
@@ -1451,24 +2405,26 @@ class CalendarApp(QMainWindow):
             self._apply_theme(theme)
 
             # 手動祝日（文字列 → set へ）
-            self.holidays = parse_holidays_str(self.settings.get("holidays", ""))
+            self._set_holidays(parse_holidays_str(self.settings.get("holidays", "")))
 
             # ★ 自動拡張日数の反映
             self.expand_each = int(self.settings.get("expand_days_each", getattr(self, "expand_each", 60)))
 
-            # ヘッダー更新（列数・ラベル・幅）
-            headers = ["日付"] + [c["title"] for c in self.columns]
-            self.table.setColumnCount(1 + len(self.columns))
-            self.table.setHorizontalHeaderLabels(headers)
-            self.table.setColumnWidth(0, 120)
-            for i, col in enumerate(self.columns, start=1):
-                self.table.setColumnWidth(i, int(col.get("width", 240)))
-
-            # 現在の範囲を再構築（祝日色・エディタ等を再作成）
-            self.rebuild_all()
-
-            # 全セルのフォントサイズを適用
-            self._apply_font_all(self.font_pt)
+            # 列の増減・並べ替えがあった時だけ現在の範囲をモデルごと再構築する
+            # （rebuild_range 内で全行の行高計算を1回だけ行う）。祝日色は _set_holidays で更新済み
+            if [c.get("id") for c in self.columns] != prev_ids:
+                self.rebuild_all()
+            else:
+                # 列名だけの変更は見出しの再表示で足りる
+                if [c.get("title") for c in self.columns] != prev_titles:
+                    self.model.refresh_headers()
+                if [c.get("width") for c in self.columns] != prev_widths or self.font_pt != prev_font:
+                    # 幅・文字サイズだけなら、幅を合わせて行高を1回だけ計算し直す
+                    self._apply_column_widths()
+                    for ed in self.table.viewport().findChildren(AutoResizeTextEdit):
+                        ed.setPointSize(self.font_pt)
+                    self._recalc_all_row_heights()
+                    self.table.viewport().update()
 
             # 表示位置を復元（最上段に戻す）
             if isinstance(top_anchor, date):
@@ -1496,6 +2452,7 @@ class CalendarApp(QMainWindow):
         # ▼フォルダ自動生成
         self._ensure_autosave_dir()
 
+        self._autosave_enabled = enabled
         if enabled:
             if interval_sec < 3:
                 interval_sec = 3
@@ -1507,22 +2464,41 @@ class CalendarApp(QMainWindow):
             if getattr(self, "_autosave_timer", None) is not None:
                 self._autosave_timer.stop()
 
-    def _mark_dirty(self):
+    def _mark_dirty(self, key: str | None = None):
         self._dirty = True
+        self._cells_gen += 1
+        if key is not None:
+            self._dirty_keys.add(key)
+        self._resume_autosave_timer()
+
+    def _resume_autosave_timer(self):
+        """変更が無い間は止めている自動保存タイマーを、変更が入った時点で動かす。"""
+        timer = getattr(self, "_autosave_timer", None)
+        if self._autosave_enabled and timer is not None and not timer.isActive():
+            timer.start()
 
     def _autosave_tick(self):
-        if self._dirty and self.autosave_path:
-            try:
-                self._write_json(self.autosave_path)
-                self._dirty = False
-            except Exception:
-                pass
+        """変更があれば保存する。通常は変更日だけ差分ログへ追記し、必要時のみ全体を書き直す。"""
+        self.delegate.flush_pending_commits()
+        if not (self._dirty and self.autosave_path):
+            # 保存するものが無い間は起きないよう止める（次の変更で _mark_dirty が再開する）
+            self._autosave_timer.stop()
+            return
+        try:
+            if self._can_append_delta():
+                self._append_delta(self.autosave_path)
+            else:
+                self._submit_full_autosave(self.autosave_path)
+            self._dirty = False
+        except Exception:
+            pass
 
     def closeEvent(self, ev: QCloseEvent):
         try:
-            self._save_settings()
-            if getattr(self, "_dirty", False) and self.autosave_path:
-                self._write_json(self.autosave_path)
+            self._save_settings_now()
+            self.delegate.flush_pending_commits()
+            # 終了時は差分ログを本体へ書き戻して1ファイルにまとめる
+            self._compact_autosave()
         except Exception:
             pass
         super().closeEvent(ev)